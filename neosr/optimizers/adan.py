@@ -1,4 +1,5 @@
 import math
+import os
 from collections.abc import Callable, Iterable
 from typing import Any
 
@@ -6,6 +7,14 @@ import torch
 from torch import Tensor
 from torch.optim.optimizer import Optimizer
 
+try:
+    import triton
+    import triton.language as tl
+
+    has_triton = True
+except ImportError:
+    has_triton = False
+
 
 class adan(Optimizer):
     """'Adan: Adaptive Nesterov Momentum Algorithm for Faster Optimizing Deep Models':
@@ -28,6 +37,19 @@ class adan(Optimizer):
             (default: False)
         foreach (bool): if True would use torch._foreach implementation.
             It's faster but uses slightly more memory. (default: True)
+        fused (bool): if True, uses the fused Triton kernel whenever all
+            tensors are contiguous cuda tensors of a floating dtype,
+            falling back to the foreach path otherwise. (default: True)
+        capturable (bool): whether this instance is safe to capture in a
+            CUDA graph. Keeps the step counter and bias corrections on
+            device, at a small cost in eager mode. Capture step() after
+            one warmup step, with a fixed lr. (default: False)
+        state_dtype (torch.dtype | str, optional): dtype used to store
+            the optimizer state. torch.bfloat16 halves state memory and
+            bandwidth; the update itself is still computed in fp32.
+            Accepts a dtype name such as "bfloat16", so it can be set
+            from the toml options. (default: None, same dtype as each
+            parameter)
 
     """
 
@@ -41,8 +63,19 @@ class adan(Optimizer):
         max_grad_norm: float = 0.0,
         no_prox: bool = True,
         foreach: bool = True,
+        fused: bool = True,
+        capturable: bool = False,
+        state_dtype: torch.dtype | str | None = None,
         **kwargs,  # noqa: ARG002
     ) -> None:
+        if isinstance(state_dtype, str):
+            # allow dtype names, since the toml options can't express
+            # torch.dtype values
+            resolved = getattr(torch, state_dtype, None)
+            if not isinstance(resolved, torch.dtype):
+                msg = f"Invalid state_dtype: {state_dtype}"
+                raise ValueError(msg)  # noqa: TRY004
+            state_dtype = resolved
         if not max_grad_norm >= 0.0:
             msg = f"Invalid Max grad norm: {max_grad_norm}"
             raise ValueError(msg)
@@ -70,54 +103,98 @@ class adan(Optimizer):
             "max_grad_norm": max_grad_norm,
             "no_prox": no_prox,
             "foreach": foreach,
+            "fused": fused,
+            "capturable": capturable,
+            "state_dtype": state_dtype,
         }
         super().__init__(params, defaults)
+        # per-group dispatch decision, resolved once on the first step
+        self._impl_cache: dict[int, Callable[..., None]] = {}
 
     def __setstate__(self, state: dict[str, bool]) -> None:
         super().__setstate__(state)
+        self.__dict__.setdefault("_impl_cache", {})
+        self._impl_cache.clear()
         for group in self.param_groups:
             group.setdefault("no_prox", False)
+            group.setdefault("fused", True)
+            group.setdefault("capturable", False)
+            group.setdefault("state_dtype", None)
+            if group["state_dtype"] is not None:
+                # Optimizer.load_state_dict casts float state back to
+                # the param dtype, so re-cast on resume
+                for p in group["params"]:
+                    state = self.state.get(p)
+                    if not state:
+                        continue
+                    for key in (
+                        "exp_avg",
+                        "exp_avg_sq",
+                        "exp_avg_diff",
+                        "neg_pre_grad",
+                    ):
+                        if key in state:
+                            state[key] = state[key].to(group["state_dtype"])
 
     @torch.no_grad()
     def restart_opt(self) -> None:
         for group in self.param_groups:
             group["step"] = 0
+            if "step_t" in group:
+                # keep the on-device counter (capturable and compiled
+                # foreach groups) in sync with the restarted python step
+                group["step_t"].zero_()
             for p in group["params"]:
                 if p.requires_grad:
                     state = self.state[p]
                     # State initialization
 
                     # Exponential moving average of gradient values
-                    state["exp_avg"] = torch.zeros_like(p)
+                    state["exp_avg"] = torch.zeros_like(
+                        p, dtype=group["state_dtype"]
+                    )
                     # Exponential moving average of squared gradient values
-                    state["exp_avg_sq"] = torch.zeros_like(p)
+                    state["exp_avg_sq"] = torch.zeros_like(
+                        p, dtype=group["state_dtype"]
+                    )
                     # Exponential moving average of gradient difference
-                    state["exp_avg_diff"] = torch.zeros_like(p)
+                    state["exp_avg_diff"] = torch.zeros_like(
+                        p, dtype=group["state_dtype"]
+                    )
+                    # Negated previous gradient
+                    state["neg_pre_grad"] = torch.zeros_like(
+                        p, dtype=group["state_dtype"]
+                    )
 
     @torch.no_grad()
     def step(self, closure: Callable[..., Any] | None = None) -> float:  # type: ignore[reportIncompatibleMethodOverride,override]
         """Performs a single optimization step."""
         loss = closure() if closure is not None else 0.0
 
+        clip_global_grad_norm: Tensor | float = 1.0
         if self.defaults["max_grad_norm"] > 0:
-            device = self.param_groups[0]["params"][0].device
-            global_grad_norm = torch.zeros(1, device=device)
-
-            max_grad_norm = torch.tensor(self.defaults["max_grad_norm"], device=device)
-            for group in self.param_groups:
-                for p in group["params"]:
-                    if p.grad is not None:
-                        grad = p.grad
-                        global_grad_norm.add_(grad.pow(2).sum())
-
-            global_grad_norm = torch.sqrt(global_grad_norm)
-
-            clip_global_grad_norm = torch.clamp(
-                max_grad_norm / (global_grad_norm + group["eps"]),  # type: ignore[reportPossiblyUnboundVariable]
-                max=1.0,
-            ).item()
-        else:
-            clip_global_grad_norm = 1.0
+            all_grads = [
+                p.grad
+                for group in self.param_groups
+                for p in group["params"]
+                if p.grad is not None
+            ]
+
+            if all_grads:
+                # batched multi-tensor norm instead of one pow+sum per
+                # parameter
+                norms = torch._foreach_norm(all_grads, 2.0)
+                global_grad_norm = torch.linalg.vector_norm(torch.stack(norms))
+
+                # max_grad_norm is a plain float, so no device tensor
+                # (and host->device copy) is needed on the critical path.
+                # kept as a 0-dim tensor: calling .item() here would force
+                # a device->host sync and stall the launch queue every step
+                clip_global_grad_norm = torch.clamp(
+                    self.defaults["max_grad_norm"]
+                    / (global_grad_norm + self.defaults["eps"]),
+                    max=1.0,
+                )
 
         for group in self.param_groups:
             params_with_grad = []
@@ -136,10 +213,6 @@ class adan(Optimizer):
             else:
                 group["step"] = 1
 
-            bias_correction1 = 1.0 - beta1 ** group["step"]
-            bias_correction2 = 1.0 - beta2 ** group["step"]
-            bias_correction3 = 1.0 - beta3 ** group["step"]
-
             for p in group["params"]:
                 if p.grad is None:
                     continue
@@ -147,13 +220,14 @@ class adan(Optimizer):
                 grads.append(p.grad)
 
                 state = self.state[p]
+                state_dtype = group["state_dtype"]
                 if len(state) == 0:
-                    state["exp_avg"] = torch.zeros_like(p)
-                    state["exp_avg_sq"] = torch.zeros_like(p)
-                    state["exp_avg_diff"] = torch.zeros_like(p)
-
-                if "neg_pre_grad" not in state or group["step"] == 1:
-                    state["neg_pre_grad"] = p.grad.clone().mul_(-clip_global_grad_norm)
+                    state["exp_avg"] = torch.zeros_like(p, dtype=state_dtype)
+                    state["exp_avg_sq"] = torch.zeros_like(p, dtype=state_dtype)
+                    state["exp_avg_diff"] = torch.zeros_like(p, dtype=state_dtype)
+                    # zero init instead of cloning every grad; the diff
+                    # term of the first step is skipped in the impls
+                    state["neg_pre_grad"] = torch.zeros_like(p, dtype=state_dtype)
 
                 exp_avgs.append(state["exp_avg"])
                 exp_avg_sqs.append(state["exp_avg_sq"])
@@ -163,6 +237,88 @@ class adan(Optimizer):
             if not params_with_grad:
                 continue
 
+            # device, dtype and contiguity are stable across a training
+            # run, so resolve the dispatch once per group instead of
+            # re-testing every tensor on every step
+            impl = self._impl_cache.get(id(group))
+            if impl is None:
+                # in-place foreach ops cannot mix state and grad dtypes,
+                # so low-precision state routes to the fused kernel or to
+                # the single-tensor path, which promote per tensor
+                lowp_state = group["state_dtype"] is not None and any(
+                    ea.dtype != g.dtype
+                    for ea, g in zip(exp_avgs, grads, strict=True)
+                )
+
+                # the Triton kernel bakes its scalar arguments at launch,
+                # so it cannot be replayed with a moving step counter
+                if (
+                    group["fused"]
+                    and not group["capturable"]
+                    and _fused_allowed(
+                        params_with_grad,
+                        grads,
+                        exp_avgs,
+                        exp_avg_sqs,
+                        exp_avg_diffs,
+                        neg_pre_grads,
+                    )
+                ):
+                    impl = _fused_adan
+                elif group["foreach"] and not lowp_state:
+                    # capturable groups are captured by the caller via
+                    # torch.cuda.graph(), which must not nest inside the
+                    # reduce-overhead compiled wrapper (it manages its
+                    # own graph trees and guard checks)
+                    impl = (
+                        _multi_tensor_adan_eager
+                        if group["capturable"]
+                        else _multi_tensor_adan
+                    )
+                else:
+                    impl = _single_tensor_adan
+                self._impl_cache[id(group)] = impl
+
+            # dynamo guards the compiled foreach path on the exact value
+            # of float arguments, so step-dependent scalars must be
+            # handed over as 0-dim tensors or every step recompiles
+            compiled_foreach = (
+                impl is _multi_tensor_adan
+                and _multi_tensor_adan is not _multi_tensor_adan_eager
+            )
+
+            lr = group["lr"]
+            if group["capturable"] or compiled_foreach:
+                # on-device step counter: recomputed inside the graph on
+                # replay (capturable) and guarded only by dtype/shape
+                # (compiled foreach). seeded from the python step so
+                # resumed runs stay in sync
+                if "step_t" not in group:
+                    group["step_t"] = torch.tensor(
+                        float(group["step"] - 1),
+                        device=params_with_grad[0].device,
+                    )
+                step_t = group["step_t"]
+                step_t.add_(1)
+                bias_correction1 = 1.0 - beta1**step_t
+                bias_correction2 = 1.0 - beta2**step_t
+                bias_correction3_sqrt = (1.0 - beta3**step_t).sqrt()
+            else:
+                bias_correction1 = 1.0 - beta1 ** group["step"]
+                bias_correction2 = 1.0 - beta2 ** group["step"]
+                bias_correction3_sqrt = math.sqrt(1.0 - beta3 ** group["step"])
+
+            if compiled_foreach:
+                # the schedulers mutate lr between steps, which is the
+                # same recompile hazard; keep it in a reused 0-dim tensor
+                if "lr_t" not in group:
+                    group["lr_t"] = torch.tensor(
+                        lr, device=params_with_grad[0].device
+                    )
+                else:
+                    group["lr_t"].fill_(lr)
+                lr = group["lr_t"]
+
             kwargs = {
                 "params": params_with_grad,
                 "grads": grads,
@@ -175,18 +331,17 @@ class adan(Optimizer):
                 "beta3": beta3,
                 "bias_correction1": bias_correction1,
                 "bias_correction2": bias_correction2,
-                "bias_correction3_sqrt": math.sqrt(bias_correction3),
-                "lr": group["lr"],
+                "bias_correction3_sqrt": bias_correction3_sqrt,
+                "lr": lr,
                 "weight_decay": group["weight_decay"],
                 "eps": group["eps"],
                 "no_prox": group["no_prox"],
+                "capturable": group["capturable"],
+                "first_step": group["step"] == 1,
                 "clip_global_grad_norm": clip_global_grad_norm,
             }
 
-            if group["foreach"]:
-                _multi_tensor_adan(**kwargs)
-            else:
-                _single_tensor_adan(**kwargs)
+            impl(**kwargs)
 
         return loss
 
@@ -202,15 +357,29 @@ def _single_tensor_adan(
     beta1: float,
     beta2: float,
     beta3: float,
-    bias_correction1: float,
-    bias_correction2: float,
-    bias_correction3_sqrt: float,
+    bias_correction1: float | Tensor,
+    bias_correction2: float | Tensor,
+    bias_correction3_sqrt: float | Tensor,
     lr: float,
     weight_decay: float,
     eps: float,
     no_prox: bool,
-    clip_global_grad_norm: Tensor,
+    capturable: bool,
+    first_step: bool,
+    clip_global_grad_norm: Tensor | float,
 ) -> None:
+    grad_clip = isinstance(clip_global_grad_norm, Tensor)
+
+    # scalar factors are loop-invariant, compute them once per step
+    # (0-dim tensors when capturable, so they track the on-device step)
+    one_minus_beta1 = 1 - beta1
+    one_minus_beta2 = 1 - beta2
+    one_minus_beta3 = 1 - beta3
+    step_size = lr / bias_correction1
+    step_size_diff = lr * beta2 / bias_correction2
+    wd_mul = 1 - lr * weight_decay
+    wd_div = 1 + lr * weight_decay
+
     for i, param in enumerate(params):
         grad = grads[i]
         exp_avg = exp_avgs[i]
@@ -218,37 +387,156 @@ def _single_tensor_adan(
         exp_avg_diff = exp_avg_diffs[i]
         neg_grad_or_diff = neg_pre_grads[i]
 
-        grad.mul_(clip_global_grad_norm)
+        # low-precision state is promoted to the compute dtype for the
+        # update and rounded back on store
+        lowp = exp_avg.dtype != grad.dtype
+        if lowp:
+            state_out = (exp_avg, exp_avg_sq, exp_avg_diff, neg_grad_or_diff)
+            exp_avg = exp_avg.to(grad.dtype)
+            exp_avg_sq = exp_avg_sq.to(grad.dtype)
+            exp_avg_diff = exp_avg_diff.to(grad.dtype)
+            neg_grad_or_diff = neg_grad_or_diff.to(grad.dtype)
+
+        if grad_clip:
+            grad.mul_(clip_global_grad_norm)
 
         # for memory saving, we use `neg_grad_or_diff`
-        # to get some temp variable in a inplace way
-        neg_grad_or_diff.add_(grad)
+        # to get some temp variable in a inplace way.
+        # on the first step neg_grad_or_diff is zero-initialized and the
+        # previous grad is defined as the current one, so the diff term
+        # stays zero
+        if not first_step:
+            neg_grad_or_diff.add_(grad)
 
-        exp_avg.mul_(beta1).add_(grad, alpha=1 - beta1)  # m_t
-        exp_avg_diff.mul_(beta2).add_(neg_grad_or_diff, alpha=1 - beta2)  # diff_t
+        # lerp_ fuses mul_ + add_ into a single pass over the state
+        exp_avg.lerp_(grad, one_minus_beta1)  # m_t
+        exp_avg_diff.lerp_(neg_grad_or_diff, one_minus_beta2)  # diff_t
 
         neg_grad_or_diff.mul_(beta2).add_(grad)
         exp_avg_sq.mul_(beta3).addcmul_(
-            neg_grad_or_diff, neg_grad_or_diff, value=1 - beta3
+            neg_grad_or_diff, neg_grad_or_diff, value=one_minus_beta3
         )  # n_t
 
         denom = ((exp_avg_sq).sqrt() / bias_correction3_sqrt).add_(eps)
-        step_size_diff = lr * beta2 / bias_correction2
-        step_size = lr / bias_correction1
 
-        if no_prox:
-            param.mul_(1 - lr * weight_decay)
+        if capturable:
+            # addcdiv_ only takes a Number value, so fold the tensor step
+            # sizes into per-term denominators instead
+            denom_m = denom / -step_size
+            denom_diff = denom / -step_size_diff
+            if no_prox:
+                param.mul_(wd_mul)
+                param.addcdiv_(exp_avg, denom_m)
+                param.addcdiv_(exp_avg_diff, denom_diff)
+            else:
+                param.addcdiv_(exp_avg, denom_m)
+                param.addcdiv_(exp_avg_diff, denom_diff)
+                param.div_(wd_div)
+        elif no_prox:
+            param.mul_(wd_mul)
             param.addcdiv_(exp_avg, denom, value=-step_size)
             param.addcdiv_(exp_avg_diff, denom, value=-step_size_diff)
         else:
             param.addcdiv_(exp_avg, denom, value=-step_size)
             param.addcdiv_(exp_avg_diff, denom, value=-step_size_diff)
-            param.div_(1 + lr * weight_decay)
+            param.div_(wd_div)
+
+        # single pass instead of zero_ + add_
+        torch.neg(grad, out=neg_grad_or_diff)
+
+        if lowp:
+            for dst, src in zip(
+                state_out,
+                (exp_avg, exp_avg_sq, exp_avg_diff, neg_grad_or_diff),
+                strict=True,
+            ):
+                dst.copy_(src)
+
+
+if has_triton:
+
+    @triton.jit
+    def _fused_adan_kernel(
+        param_ptr,
+        grad_ptr,
+        exp_avg_ptr,
+        exp_avg_sq_ptr,
+        exp_avg_diff_ptr,
+        neg_pre_grad_ptr,
+        n_elements,
+        beta1,
+        beta2,
+        beta3,
+        bias_correction1,
+        bias_correction2,
+        bias_correction3_sqrt,
+        lr,
+        weight_decay,
+        eps,
+        clip_global_grad_norm_ptr,
+        no_prox: tl.constexpr,
+        grad_clip: tl.constexpr,
+        first_step: tl.constexpr,
+        BLOCK_SIZE: tl.constexpr,
+    ):
+        pid = tl.program_id(0)
+        offs = pid * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        mask = offs < n_elements
+
+        # promote to fp32 in registers: state may be stored in bf16/fp16,
+        # the stores below round back to each buffer's dtype
+        grad = tl.load(grad_ptr + offs, mask=mask).to(tl.float32)
+        exp_avg = tl.load(exp_avg_ptr + offs, mask=mask).to(tl.float32)
+        exp_avg_sq = tl.load(exp_avg_sq_ptr + offs, mask=mask).to(tl.float32)
+        exp_avg_diff = tl.load(exp_avg_diff_ptr + offs, mask=mask).to(tl.float32)
+        param = tl.load(param_ptr + offs, mask=mask).to(tl.float32)
+
+        if grad_clip:
+            grad = grad * tl.load(clip_global_grad_norm_ptr)
+        if first_step:
+            # neg_pre_grad is zero-initialized and the previous grad is
+            # defined as the current one, so the diff term stays zero
+            diff = tl.zeros([BLOCK_SIZE], dtype=tl.float32)
+        else:
+            neg_pre_grad = tl.load(neg_pre_grad_ptr + offs, mask=mask).to(tl.float32)
+            diff = neg_pre_grad + grad
+        exp_avg = beta1 * exp_avg + (1 - beta1) * grad  # m_t
+        exp_avg_diff = beta2 * exp_avg_diff + (1 - beta2) * diff  # diff_t
+        update = grad + beta2 * diff
+        exp_avg_sq = beta3 * exp_avg_sq + (1 - beta3) * update * update  # n_t
+
+        denom = tl.sqrt(exp_avg_sq) / bias_correction3_sqrt + eps
+        step_size = lr / bias_correction1
+        step_size_diff = lr * beta2 / bias_correction2
+
+        if no_prox:
+            param = param * (1 - lr * weight_decay)
+            param = param - step_size * exp_avg / denom
+            param = param - step_size_diff * exp_avg_diff / denom
+        else:
+            param = param - step_size * exp_avg / denom
+            param = param - step_size_diff * exp_avg_diff / denom
+            param = param / (1 + lr * weight_decay)
 
-        neg_grad_or_diff.zero_().add_(grad, alpha=-1.0)
+        tl.store(param_ptr + offs, param, mask=mask)
+        tl.store(exp_avg_ptr + offs, exp_avg, mask=mask)
+        tl.store(exp_avg_sq_ptr + offs, exp_avg_sq, mask=mask)
+        tl.store(exp_avg_diff_ptr + offs, exp_avg_diff, mask=mask)
+        tl.store(neg_pre_grad_ptr + offs, -grad, mask=mask)
 
 
-def _multi_tensor_adan(
+def _fused_allowed(*tensorlists: list[Tensor]) -> bool:
+    if not has_triton:
+        return False
+    dtypes = (torch.float32, torch.float16, torch.bfloat16)
+    return all(
+        t.is_cuda and t.is_contiguous() and t.dtype in dtypes
+        for tensors in tensorlists
+        for t in tensors
+    )
+
+
+def _fused_adan(
     params: list[Tensor],
     grads: list[Tensor],
     exp_avgs: list[Tensor],
@@ -266,22 +554,84 @@ def _multi_tensor_adan(
     weight_decay: float,
     eps: float,
     no_prox: bool,
-    clip_global_grad_norm: Tensor,
+    capturable: bool,  # noqa: ARG001
+    first_step: bool,
+    clip_global_grad_norm: Tensor | float,
+    block_size: int = 1024,
+) -> None:
+    # single kernel per tensor: loads each buffer once from HBM, keeps
+    # all intermediates in registers and writes each buffer once.
+    # the clip coefficient stays a 0-dim device tensor (loaded inside the
+    # kernel), while the unclipped case is pruned at compile time
+    grad_clip = isinstance(clip_global_grad_norm, Tensor)
+    for i, param in enumerate(params):
+        n_elements = param.numel()
+        grid = (triton.cdiv(n_elements, block_size),)
+        _fused_adan_kernel[grid](
+            param,
+            grads[i],
+            exp_avgs[i],
+            exp_avg_sqs[i],
+            exp_avg_diffs[i],
+            neg_pre_grads[i],
+            n_elements,
+            beta1,
+            beta2,
+            beta3,
+            bias_correction1,
+            bias_correction2,
+            bias_correction3_sqrt,
+            lr,
+            weight_decay,
+            eps,
+            clip_global_grad_norm,
+            no_prox=no_prox,
+            grad_clip=grad_clip,
+            first_step=first_step,
+            BLOCK_SIZE=block_size,
+        )
+
+
+def _multi_tensor_adan(
+    params: list[Tensor],
+    grads: list[Tensor],
+    exp_avgs: list[Tensor],
+    exp_avg_sqs: list[Tensor],
+    exp_avg_diffs: list[Tensor],
+    neg_pre_grads: list[Tensor],
+    *,
+    beta1: float,
+    beta2: float,
+    beta3: float,
+    bias_correction1: float | Tensor,
+    bias_correction2: float | Tensor,
+    bias_correction3_sqrt: float | Tensor,
+    lr: float | Tensor,
+    weight_decay: float,
+    eps: float,
+    no_prox: bool,
+    capturable: bool,  # noqa: ARG001
+    first_step: bool,
+    clip_global_grad_norm: Tensor | float,
 ) -> None:
     if len(params) == 0:
         return
 
-    torch._foreach_mul_(grads, clip_global_grad_norm)
+    if isinstance(clip_global_grad_norm, Tensor):
+        # 0-dim tensor scalar keeps the clip multiplication async
+        torch._foreach_mul_(grads, clip_global_grad_norm)
 
     # for memory saving, we use `neg_pre_grads`
-    # to get some temp variable in a inplace way
-    torch._foreach_add_(neg_pre_grads, grads)
+    # to get some temp variable in a inplace way.
+    # on the first step neg_pre_grads is zero-initialized and the
+    # previous grad is defined as the current one, so the diff term
+    # stays zero
+    if not first_step:
+        torch._foreach_add_(neg_pre_grads, grads)
 
-    torch._foreach_mul_(exp_avgs, beta1)
-    torch._foreach_add_(exp_avgs, grads, alpha=1 - beta1)  # m_t
-
-    torch._foreach_mul_(exp_avg_diffs, beta2)
-    torch._foreach_add_(exp_avg_diffs, neg_pre_grads, alpha=1 - beta2)  # diff_t
+    # lerp_ fuses mul_ + add_ into a single pass over the state
+    torch._foreach_lerp_(exp_avgs, grads, 1 - beta1)  # m_t
+    torch._foreach_lerp_(exp_avg_diffs, neg_pre_grads, 1 - beta2)  # diff_t
 
     torch._foreach_mul_(neg_pre_grads, beta2)
     torch._foreach_add_(neg_pre_grads, grads)
@@ -291,19 +641,64 @@ def _multi_tensor_adan(
     )  # n_t
 
     denom = torch._foreach_sqrt(exp_avg_sqs)
-    torch._foreach_div_(denom, bias_correction3_sqrt)
-    torch._foreach_add_(denom, eps)
 
     step_size_diff = lr * beta2 / bias_correction2
     step_size = lr / bias_correction1
 
-    if no_prox:
-        torch._foreach_mul_(params, 1 - lr * weight_decay)
-        torch._foreach_addcdiv_(params, exp_avgs, denom, value=-step_size)
-        torch._foreach_addcdiv_(params, exp_avg_diffs, denom, value=-step_size_diff)
+    if isinstance(bias_correction1, Tensor):
+        # capturable and compiled groups pass 0-dim tensor scalars; the
+        # foreach addcdiv value only takes a Number, so fold the tensor
+        # step sizes into per-term denominators instead
+        torch._foreach_div_(denom, [bias_correction3_sqrt] * len(denom))  # type: ignore[list-item]
+        torch._foreach_add_(denom, eps)
+        denom_m = torch._foreach_div(denom, [-step_size] * len(denom))  # type: ignore[list-item]
+        torch._foreach_div_(denom, [-step_size_diff] * len(denom))  # type: ignore[list-item]
+        if no_prox:
+            torch._foreach_mul_(params, 1 - lr * weight_decay)
+            torch._foreach_addcdiv_(params, exp_avgs, denom_m)
+            torch._foreach_addcdiv_(params, exp_avg_diffs, denom)
+        else:
+            torch._foreach_addcdiv_(params, exp_avgs, denom_m)
+            torch._foreach_addcdiv_(params, exp_avg_diffs, denom)
+            torch._foreach_div_(params, 1 + lr * weight_decay)
     else:
-        torch._foreach_addcdiv_(params, exp_avgs, denom, value=-step_size)
-        torch._foreach_addcdiv_(params, exp_avg_diffs, denom, value=-step_size_diff)
-        torch._foreach_div_(params, 1 + lr * weight_decay)
-    torch._foreach_zero_(neg_pre_grads)
-    torch._foreach_add_(neg_pre_grads, grads, alpha=-1.0)
+        torch._foreach_div_(denom, bias_correction3_sqrt)
+        torch._foreach_add_(denom, eps)
+        if no_prox:
+            torch._foreach_mul_(params, 1 - lr * weight_decay)
+            torch._foreach_addcdiv_(params, exp_avgs, denom, value=-step_size)
+            torch._foreach_addcdiv_(
+                params, exp_avg_diffs, denom, value=-step_size_diff
+            )
+        else:
+            torch._foreach_addcdiv_(params, exp_avgs, denom, value=-step_size)
+            torch._foreach_addcdiv_(
+                params, exp_avg_diffs, denom, value=-step_size_diff
+            )
+            torch._foreach_div_(params, 1 + lr * weight_decay)
+
+    # drop the zero_ pass: copy then negate in-place
+    torch._foreach_copy_(neg_pre_grads, grads)
+    torch._foreach_neg_(neg_pre_grads)
+
+
+# uncompiled reference, used by capturable groups which manage their own
+# CUDA-graph capture
+_multi_tensor_adan_eager = _multi_tensor_adan
+
+# the foreach fallback is pure tensor ops, so Inductor can fuse it and
+# reduce-overhead can graph it where the Triton kernel is unavailable
+# (e.g. ROCm). The clip coefficient stays a tensor, so there is no
+# .item() graph break. Opt out with TORCH_COMPILE_ADAN=0.
+# torch.compile itself raises RuntimeError on unsupported setups
+# (Windows, new Python versions), which must not break module import
+if os.environ.get("TORCH_COMPILE_ADAN", "1") != "0":
+    try:
+        import torch._dynamo
+
+        if torch._dynamo.is_dynamo_supported():
+            _multi_tensor_adan = torch.compile(
+                _multi_tensor_adan, mode="reduce-overhead", dynamic=False
+            )
+    except (ImportError, RuntimeError):
+        pass
@@ -140,21 +140,23 @@ class adan_sf(Optimizer):
         """Performs a single optimization step."""
         loss = closure() if closure is not None else 0.0
 
-        if self.defaults["max_grad_norm"] > 0:
-            device = self.param_groups[0]["params"][0].device
-            global_grad_norm = torch.zeros(1, device=device)
-
-            max_grad_norm = torch.tensor(self.defaults["max_grad_norm"], device=device)
-            for group in self.param_groups:
-                for p in group["params"]:
-                    if p.grad is not None:
-                        grad = p.grad
-                        global_grad_norm.add_(grad.pow(2).sum())
-
-            global_grad_norm = torch.sqrt(global_grad_norm)
-
+        all_grads = [
+            p.grad
+            for group in self.param_groups
+            for p in group["params"]
+            if p.grad is not None
+        ]
+
+        if self.defaults["max_grad_norm"] > 0 and all_grads:
+            # batched multi-tensor norm instead of one pow+sum per parameter
+            norms = torch._foreach_norm(all_grads, 2.0)
+            global_grad_norm = torch.linalg.vector_norm(torch.stack(norms))
+
+            # max_grad_norm is a plain float, so no device tensor
+            # (and host->device copy) is needed on the critical path
             clip_global_grad_norm = torch.clamp(
-                max_grad_norm / (global_grad_norm + group["eps"]),  # type: ignore[reportPossiblyUnboundVariable]
+                self.defaults["max_grad_norm"]
+                / (global_grad_norm + self.defaults["eps"]),
                 max=1.0,
             ).item()
         else:
@@ -292,11 +294,9 @@ def _multi_tensor_adan(
     # to get some temp variable in a inplace way
     torch._foreach_add_(neg_pre_grads, grads)
 
-    torch._foreach_mul_(exp_avgs, beta1)
-    torch._foreach_add_(exp_avgs, grads, alpha=1 - beta1)  # m_t
-
-    torch._foreach_mul_(exp_avg_diffs, beta2)
-    torch._foreach_add_(exp_avg_diffs, neg_pre_grads, alpha=1 - beta2)  # diff_t
+    # lerp_ fuses mul_ + add_ into a single pass over the state
+    torch._foreach_lerp_(exp_avgs, grads, 1 - beta1)  # m_t
+    torch._foreach_lerp_(exp_avg_diffs, neg_pre_grads, 1 - beta2)  # diff_t
 
     torch._foreach_mul_(neg_pre_grads, beta2)
     torch._foreach_add_(neg_pre_grads, grads)
@@ -326,5 +326,6 @@ def _multi_tensor_adan(
         torch._foreach_addcdiv_(params, exp_avgs, denom, value=-step_size)
         torch._foreach_addcdiv_(params, exp_avg_diffs, denom, value=-step_size_diff)
 
-    torch._foreach_zero_(neg_pre_grads)
-    torch._foreach_add_(neg_pre_grads, grads, alpha=-1.0)
+    # drop the zero_ pass: copy then negate in-place
+    torch._foreach_copy_(neg_pre_grads, grads)
+    torch._foreach_neg_(neg_pre_grads)